@@ -0,0 +1,24 @@
+"""
+Helpers shared by the Azure ML entry points (train_aml.py and inference_aml.py).
+
+Both scripts are run directly (`python scripts/aml/train_aml.py`, `python inference_aml.py`), so this directory is on
+sys.path and the module can be imported by name.
+"""
+
+import importlib.util
+import os
+
+
+def enable_fast_hf_downloads():
+    """
+    Configure HuggingFace downloads for the current process and its children.
+
+    Enables the multi-threaded hf_transfer backend when the package is installed (huggingface_hub refuses to download
+    if the flag is set without it) and raises the download timeout for large checkpoint files. Values already present in
+    the environment take precedence.
+
+    Note: huggingface_hub reads these variables at import time, so this must run before it is imported in-process.
+    """
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+    os.environ.setdefault("HF_HUB_DOWNLOAD_TIMEOUT", "60")
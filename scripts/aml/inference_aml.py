@@ -1,12 +1,48 @@
-from PIL import Image
-from vla import load_vla
-import torch
 import os
-import logging
+
+from _aml_common import enable_fast_hf_downloads
+
+# Use the multi-threaded hf_transfer backend for HuggingFace downloads when installed; must be set before
+# `huggingface_hub` is imported (through `vla`), since it reads these variables at import time
+enable_fast_hf_downloads()
+
+from PIL import Image  # noqa: E402
+from vla import load_vla  # noqa: E402
+import torch  # noqa: E402
+import torch.nn.functional as F  # noqa: E402
+import functools  # noqa: E402
+import logging  # noqa: E402
+
+# Let cuDNN autotune conv algorithms (e.g. the ViT patch embeddings; input shapes are fixed) and allow TF32 for fp32
+# matmuls / convolutions on Ampere+ GPUs
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.set_float32_matmul_precision('high')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+
+def _fp8_linear_forward(linear, x):
+    # De-quantize with the fp32 scale right before the matmul, then match the activation dtype
+    weight = (linear.weight.float() * linear.weight_scale).to(x.dtype)
+    return F.linear(x, weight, linear.bias)
+
+
+def quantize_linear_weights_fp8(module):
+    """Store every nn.Linear weight in `module` as per-tensor scaled float8_e4m3fn (halves weight memory vs. bf16)."""
+    fp8_max = torch.finfo(torch.float8_e4m3fn).max
+    for linear in module.modules():
+        if not isinstance(linear, torch.nn.Linear):
+            continue
+        weight = linear.weight.data
+        scale = weight.abs().amax().float().clamp(min=1e-12) / fp8_max
+        linear.weight.data = (weight.float() / scale).to(torch.float8_e4m3fn)
+        linear.register_buffer("weight_scale", scale)
+        linear.forward = functools.partial(_fp8_linear_forward, linear)
+
+
 # AzureML configuration: Use mounted datastore if available, otherwise fallback to HuggingFace
 COGACT_CHECKPOINTS = os.environ.get('COGACT_CHECKPOINTS')
 if COGACT_CHECKPOINTS and os.path.exists(COGACT_CHECKPOINTS):
@@ -34,22 +70,49 @@ model = load_vla(
 )                                 
 # about 30G Memory in fp32; 
 
-# (Optional) use "model.vlm = model.vlm.to(torch.bfloat16)" to load vlm in bf16
+# Load the VLM in bf16 (~15G less memory, half the weight traffic per forward pass); `predict_action` already runs the
+# VLM under bf16 autocast, while the DiT action model stays in fp32 for numerically stable DDIM sampling
+model.vlm = model.vlm.to(torch.bfloat16)
+
+# (Optional) set COGACT_FP8_WEIGHTS=1 to store the LLM backbone's linear weights in fp8 (~7G instead of ~14G); weights
+# are up-cast to bf16 for each matmul, so this saves memory but does not run the GEMMs in fp8
+if os.environ.get('COGACT_FP8_WEIGHTS') == '1':
+    quantize_linear_weights_fp8(model.vlm.llm_backbone)
+    logging.info("Stored LLM backbone linear weights in float8_e4m3fn")
 
 model.to('cuda:0').eval()
 
-image: Image.Image = Image.open('test_image.png').convert('RGB')  # input your image path     
+# Compile the DiT denoiser; "reduce-overhead" captures CUDA graphs, so each of the DDIM steps (identical shapes) is a
+# single graph replay instead of a few hundred kernel launches. `predict_action` passes `net.forward_with_cfg` (cfg > 1)
+# or `net.forward` to the sampler, so we compile those methods rather than wrapping the module; compiling
+# `forward_with_cfg` also captures the conditional / unconditional split and guidance mixing in the same graph.
+action_net = model.action_model.net
+action_net.forward = torch.compile(action_net.forward, mode="reduce-overhead", fullgraph=False)
+action_net.forward_with_cfg = torch.compile(action_net.forward_with_cfg, mode="reduce-overhead", fullgraph=False)
+
+image: Image.Image = Image.open('test_image.png')  # input your image path     
+# For JPEG inputs, let libjpeg decode directly at (close to) the backbone resolution instead of full size; no-op for PNG
+image.draft('RGB', (model.vlm.vision_backbone.default_image_size,) * 2)
+image = image.convert('RGB')
 prompt = "move sponge near apple"               # input your prompt
 
-# Predict Action (7-DoF; un-normalize for RT-1 google robot data, i.e., fractal20220817_data)
-actions, _ = model.predict_action(
-            image,
-            prompt,
-            unnorm_key='fractal20220817_data',  # input your unnorm_key of the dataset
-            cfg_scale = 1.5,                    # cfg from 1.5 to 7 also performs well
-            use_ddim = True,                    # use DDIM sampling
-            num_ddim_steps = 10,                # number of steps for DDIM sampling
-        )
+# Run the forward passes under `torch.inference_mode()` (no autograd bookkeeping); the compiled denoiser must be
+# warmed up and called in the same inference context, otherwise it recompiles
+with torch.inference_mode():
+    # Warm up once so that compilation (and CUDA graph capture) is paid before the real call
+    model.predict_action(
+        image, prompt, unnorm_key='fractal20220817_data', cfg_scale=1.5, use_ddim=True, num_ddim_steps=10
+    )
+
+    # Predict Action (7-DoF; un-normalize for RT-1 google robot data, i.e., fractal20220817_data)
+    actions, _ = model.predict_action(
+                image,
+                prompt,
+                unnorm_key='fractal20220817_data',  # input your unnorm_key of the dataset
+                cfg_scale = 1.5,                    # cfg from 1.5 to 7 also performs well
+                use_ddim = True,                    # use DDIM sampling
+                num_ddim_steps = 10,                # number of steps for DDIM sampling
+            )
 
 # Log results
 logging.info(f"Actions shape: {actions.shape}")  # should log torch.Size([16, 7])
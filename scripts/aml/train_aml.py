@@ -4,31 +4,224 @@ Azure ML wrapper for CogACT fine-tuning.
 
 This script wraps the CogACT training script by:
 1. Parsing command-line arguments to extract --pretrained_checkpoint
-2. Resolving checkpoint using fallback strategy (HF cache -> HuggingFace download)
-3. Launching torchrun with the resolved checkpoint and user arguments
+2. Resolving checkpoint using fallback strategy (previous run's $HF_HOME/.cogact_resolved.json -> HF cache ->
+   HuggingFace download, done once before launching)
+3. Launching torchrun (in-process, via torch.distributed.run) with the resolved checkpoint and user arguments
 
 Environment Variables:
-- HF_HOME: HuggingFace cache directory for checkpoint resolution
+- HF_HOME: HuggingFace home directory; both $HF_HOME and $HF_HOME/hub are searched for cached checkpoints
+- HF_HUB_CACHE / HUGGINGFACE_HUB_CACHE / TRANSFORMERS_CACHE: HuggingFace hub cache directory (overrides $HF_HOME/hub)
 - GPU_COUNT: Number of GPUs to use (default: 4)
+- HF_HUB_ENABLE_HF_TRANSFER: Use the hf_transfer download backend (default: 1 when hf_transfer is installed)
+- HF_HUB_DOWNLOAD_TIMEOUT: HuggingFace download timeout in seconds (default: 60)
 """
 
-import argparse
+import functools
+import glob
+import json
 import logging
 import os
-import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _aml_common import enable_fast_hf_downloads
+
+# Use the multi-threaded hf_transfer backend for HuggingFace downloads when installed; must be set before
+# `huggingface_hub` is imported, since it reads these variables at import time (torchrun and the training workers
+# inherit them as well)
+enable_fast_hf_downloads()
+
+from huggingface_hub import snapshot_download, try_to_load_from_cache  # noqa: E402
+from torch.distributed.elastic.multiprocessing.errors import ChildFailedError  # noqa: E402
+from torch.distributed.run import get_args_parser, run  # noqa: E402
 
 # Constants
 DEFAULT_HF_MODEL_ID = "CogACT/CogACT-Base"
-CHECKPOINT_FILENAMES = ["CogACT-Base.pt", "pytorch_model.bin", "model.safetensors"]
+HF_CACHE_MODEL_DIR = "models--CogACT--CogACT-Base"
+HF_CACHE_SNAPSHOTS_DIR = os.path.join(HF_CACHE_MODEL_DIR, "snapshots")
+HF_CACHE_MAIN_REF_FILE = os.path.join(HF_CACHE_MODEL_DIR, "refs", "main")
+SNAPSHOT_DIRS_GLOB = os.path.join("snapshots", "*", "")  # relative to HF_CACHE_MODEL_DIR; trailing "" matches dirs only
+CHECKPOINT_FILENAMES = ("CogACT-Base.pt", "pytorch_model.bin", "model.safetensors")
+CHECKPOINT_FILENAME_SET = frozenset(CHECKPOINT_FILENAMES)
+# Directory entries the checkpoint search looks at (in the base directory / in a snapshot directory)
+BASE_DIR_ENTRY_NAMES = CHECKPOINT_FILENAME_SET | {HF_CACHE_MODEL_DIR}
+SNAPSHOT_ENTRY_NAMES = CHECKPOINT_FILENAME_SET | {"checkpoints"}
+# Checkpoint files within the HF repo, in order of preference (snapshot root first, then checkpoints/)
+HF_REPO_CHECKPOINT_FILES = CHECKPOINT_FILENAMES + tuple(f"checkpoints/{name}" for name in CHECKPOINT_FILENAMES)
+RESOLVED_CHECKPOINT_SIDECAR = ".cogact_resolved.json"  # written to $HF_HOME
+RESOLVED_CHECKPOINT_TTL_SECONDS = 24 * 60 * 60
 DEFAULT_GPU_COUNT = 4
+SNAPSHOT_PROBE_WORKERS = 8
+SERIAL_PROBE_MAX_SNAPSHOTS = 2  # probe this many snapshots (or fewer) without a thread pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def find_checkpoint_in_directory(base_dir, description="checkpoint"):
+def _scan_directory(path, names):
+    """
+    List a directory once with os.scandir, keeping only the entries of interest.
+
+    Args:
+        path (str): Directory to list
+        names (frozenset): Entry names to keep; everything else (e.g. other models on a shared cache) is skipped
+
+    Returns:
+        dict: Mapping from entry name to os.DirEntry (empty if the directory cannot be read)
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry for entry in entries if entry.name in names}
+    except OSError:
+        return {}
+
+
+def _first_checkpoint_entry(entries):
+    """
+    Pick the preferred checkpoint file among the entries of a single directory.
+
+    Args:
+        entries (dict): Mapping from entry name to os.DirEntry, as returned by _scan_directory
+
+    Returns:
+        str or None: Path of the first file in CHECKPOINT_FILENAMES order, or None if there is none
+    """
+    for filename in CHECKPOINT_FILENAMES:
+        entry = entries.get(filename)
+        if entry is not None and entry.is_file():
+            return entry.path
+    return None
+
+
+def _probe_snapshot(snapshot_path):
+    """
+    Find the preferred checkpoint file within a single HuggingFace snapshot directory.
+
+    Args:
+        snapshot_path (str): Path to a models--CogACT--CogACT-Base/snapshots/<revision> directory
+
+    Returns:
+        str or None: Path to the checkpoint file, or None if the snapshot does not contain one
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  Checking: %s", snapshot_path)
+
+    # Check for checkpoint files in snapshot root
+    snapshot_entries = _scan_directory(snapshot_path, SNAPSHOT_ENTRY_NAMES)
+    checkpoint_path = _first_checkpoint_entry(snapshot_entries)
+
+    # Also check in checkpoints/ subdirectory within snapshot
+    checkpoints_subdir = snapshot_entries.get("checkpoints")
+    if checkpoint_path is None and checkpoints_subdir is not None and checkpoints_subdir.is_dir():
+        checkpoint_path = _first_checkpoint_entry(_scan_directory(checkpoints_subdir.path, CHECKPOINT_FILENAME_SET))
+
+    return checkpoint_path
+
+
+def _find_in_hf_cache(cache_dir):
+    """
+    Look up the CogACT checkpoint through huggingface_hub's own cache resolution.
+
+    try_to_load_from_cache follows refs/main to the most recently downloaded revision and checks the expected files
+    directly, without listing any directory.
+
+    Args:
+        cache_dir (str): HuggingFace hub cache directory containing models--CogACT--CogACT-Base
+
+    Returns:
+        str or None: Path to the cached checkpoint file, or None if it cannot be resolved this way
+    """
+    for filename in HF_REPO_CHECKPOINT_FILES:
+        try:
+            cached_path = try_to_load_from_cache(DEFAULT_HF_MODEL_ID, filename, cache_dir=cache_dir)
+        except (OSError, ValueError):
+            return None
+        # Non-str results are None (not cached) or a sentinel for files known not to exist upstream
+        if isinstance(cached_path, str):
+            return cached_path
+    return None
+
+
+def _mtime_ns(path):
+    """
+    Get the modification time of a path.
+
+    Args:
+        path (str): Path to stat
+
+    Returns:
+        int or None: st_mtime_ns of the path, or None if it cannot be stat'ed
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _find_cached(base_dir, base_mtime_ns, snapshots_mtime_ns, main_ref_mtime_ns):
+    """
+    Scan base_dir for a checkpoint; memoized on the directory mtimes so that repeated lookups skip the walk.
+
+    Adding or removing a checkpoint in base_dir or a snapshot in the HF cache, or moving refs/main to another
+    (possibly already cached) revision, bumps one of the mtimes and therefore invalidates the cached result.
+
+    Args:
+        base_dir (str): Base directory to search in
+        base_mtime_ns (int or None): Modification time of base_dir (cache key only)
+        snapshots_mtime_ns (int or None): Modification time of the snapshots directory (cache key only)
+        main_ref_mtime_ns (int or None): Modification time of the refs/main file (cache key only)
+
+    Returns:
+        tuple: (path to the first checkpoint file found or None, number of candidate locations checked)
+    """
+    # Check for direct file in root
+    base_entries = _scan_directory(base_dir, BASE_DIR_ENTRY_NAMES)
+    checkpoint_path = _first_checkpoint_entry(base_entries)
+    if checkpoint_path:
+        return checkpoint_path, 1
+
+    # Check HuggingFace cache structure: models--CogACT--CogACT-Base/snapshots/*/
+    cogact_model_dir = base_entries.get(HF_CACHE_MODEL_DIR)
+    if cogact_model_dir is None or not cogact_model_dir.is_dir():
+        return None, 1
+
+    # Resolve the latest revision the way huggingface_hub does; fall back to walking every snapshot (e.g. when refs/ is
+    # missing because the snapshot was copied to the mount by hand)
+    checkpoint_path = _find_in_hf_cache(base_dir)
+    if checkpoint_path:
+        return checkpoint_path, 2
+
+    # Match snapshot directories with a single glob (the trailing separator restricts matches to directories); sorting
+    # makes the pick independent of the mount's listing order when several revisions are cached
+    snapshots_pattern = os.path.join(glob.escape(cogact_model_dir.path), SNAPSHOT_DIRS_GLOB)
+    snapshot_paths = sorted(os.path.dirname(path) for path in glob.glob(snapshots_pattern))
+
+    # Usually there is a single cached revision; a thread pool only pays off once there are several to probe
+    if len(snapshot_paths) <= SERIAL_PROBE_MAX_SNAPSHOTS:
+        probe_results = map(_probe_snapshot, snapshot_paths)
+        pool = None
+    else:
+        # Probing is pure I/O wait, so threads overlap the per-snapshot round-trips; results are consumed in listing
+        # order and the probes that have not started yet are cancelled as soon as a checkpoint is found
+        pool = ThreadPoolExecutor(max_workers=min(len(snapshot_paths), SNAPSHOT_PROBE_WORKERS))
+        probe_results = pool.map(_probe_snapshot, snapshot_paths)
+
+    try:
+        for snapshots_checked, checkpoint_path in enumerate(probe_results, start=1):
+            if checkpoint_path:
+                return checkpoint_path, 2 + snapshots_checked
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return None, 2 + len(snapshot_paths)
+
+
+def find_checkpoint_in_directory(base_dir, description="CogACT"):
     """
     Find CogACT checkpoint files in a directory structure.
 
@@ -37,86 +230,197 @@ def find_checkpoint_in_directory(base_dir, description="checkpoint"):
     2. HuggingFace cache structure: models--CogACT--CogACT-Base/snapshots/*/
     3. Checkpoints subdirectory within snapshots
 
+    Each directory is listed once with os.scandir (whose DirEntry results cache file type information), and the search
+    returns as soon as a checkpoint is found, which keeps the number of round-trips low on blob-mounted filesystems.
+    Snapshot directories are probed concurrently when there are more than a couple of them. Results are memoized per
+    (base_dir, mtimes), so repeated lookups of an unchanged directory cost three stat calls. A single INFO line
+    summarizes each search.
+
     Args:
         base_dir (str): Base directory to search in
-        description (str): Description for logging purposes
+        description (str): Description for logging purposes, used as "<description> checkpoint"
 
     Returns:
         str or None: Path to the first checkpoint file found, or None if not found
     """
-    if not base_dir or not os.path.exists(base_dir):
+    if not base_dir:
         return None
 
-    # Common checkpoint file patterns (in order of preference)
-    checkpoint_files = CHECKPOINT_FILENAMES
+    # Per-location progress is DEBUG only
+    logger.debug("Checking for %s checkpoint in: %s", description, base_dir)
 
-    possible_checkpoint_paths = []
+    start_time = time.perf_counter()
+    snapshots_dir = os.path.join(base_dir, HF_CACHE_SNAPSHOTS_DIR)
+    main_ref_file = os.path.join(base_dir, HF_CACHE_MAIN_REF_FILE)
+    checkpoint_path, locations_checked = _find_cached(
+        base_dir, _mtime_ns(base_dir), _mtime_ns(snapshots_dir), _mtime_ns(main_ref_file)
+    )
 
-    # Check for direct file in root
-    for filename in checkpoint_files:
-        direct_path = os.path.join(base_dir, filename)
-        possible_checkpoint_paths.append(direct_path)
+    logger.info(
+        "Checked %d candidate location(s) for %s checkpoint in %s (%.3fs); found: %s",
+        locations_checked,
+        description,
+        base_dir,
+        time.perf_counter() - start_time,
+        checkpoint_path or "none",
+    )
+    return checkpoint_path
 
-    # Check HuggingFace cache structure: models--CogACT--CogACT-Base/snapshots/*/
-    cogact_model_dir = os.path.join(base_dir, "models--CogACT--CogACT-Base")
-    if os.path.exists(cogact_model_dir):
-        snapshots_dir = os.path.join(cogact_model_dir, "snapshots")
-        if os.path.exists(snapshots_dir):
-            try:
-                for snapshot_id in os.listdir(snapshots_dir):
-                    snapshot_path = os.path.join(snapshots_dir, snapshot_id)
-                    if os.path.isdir(snapshot_path):
-                        # Check for checkpoint files in snapshot root
-                        for filename in checkpoint_files:
-                            checkpoint_path = os.path.join(snapshot_path, filename)
-                            possible_checkpoint_paths.append(checkpoint_path)
-
-                        # Also check in checkpoints/ subdirectory within snapshot
-                        checkpoints_subdir = os.path.join(snapshot_path, "checkpoints")
-                        if os.path.exists(checkpoints_subdir):
-                            for filename in checkpoint_files:
-                                checkpoint_path = os.path.join(checkpoints_subdir, filename)
-                                possible_checkpoint_paths.append(checkpoint_path)
-            except OSError:
-                pass
-
-    # Log what we're checking
-    logger.info("Checking for %s checkpoint in: %s", description, base_dir)
-    for path in possible_checkpoint_paths:
-        exists_status = "EXISTS" if os.path.exists(path) else "NOT FOUND"
-        logger.info("  Checking: %s -> %s", path, exists_status)
-
-    # Return the first existing checkpoint
-    for path in possible_checkpoint_paths:
-        if os.path.exists(path):
-            return path
 
-    return None
+def _resolve_hf_cache_dir():
+    """
+    Resolve the HuggingFace hub cache directory.
 
+    Follows huggingface_hub's precedence (HF_HUB_CACHE, HUGGINGFACE_HUB_CACHE, then $HF_HOME/hub), but also honors
+    transformers' TRANSFORMERS_CACHE ahead of $HF_HOME/hub. huggingface_hub itself ignores TRANSFORMERS_CACHE, so when it
+    is set, the directory searched (and pre-downloaded into) here differs from the default one of plain hub downloads.
 
-def resolve_pretrained_checkpoint(hf_cache_dir, pretrained_checkpoint):
+    Returns:
+        str or None: Hub cache directory, or None if no relevant environment variable is set
+    """
+    hf_home = os.environ.get("HF_HOME")
+    return (
+        os.environ.get("HF_HUB_CACHE")
+        or os.environ.get("HUGGINGFACE_HUB_CACHE")
+        or os.environ.get("TRANSFORMERS_CACHE")
+        or (os.path.join(hf_home, "hub") if hf_home else None)
+    )
+
+
+def read_resolved_checkpoint(sidecar_path):
+    """
+    Read the checkpoint path resolved by a previous run from its sidecar file.
+
+    The entry is only trusted if it is younger than RESOLVED_CHECKPOINT_TTL_SECONDS, refers to DEFAULT_HF_MODEL_ID, and
+    the checkpoint file still exists with the recorded size and modification time.
+
+    Args:
+        sidecar_path (str or None): Path to the sidecar JSON file
+
+    Returns:
+        str or None: Previously resolved checkpoint path, or None if there is no valid entry
+    """
+    if not sidecar_path:
+        return None
+
+    try:
+        with open(sidecar_path, "r") as f:
+            resolved = json.load(f)
+        if resolved["repo_id"] != DEFAULT_HF_MODEL_ID or time.time() - resolved["ts"] > RESOLVED_CHECKPOINT_TTL_SECONDS:
+            return None
+        stat = os.stat(resolved["path"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if stat.st_size != resolved["size"] or stat.st_mtime != resolved["mtime"]:
+        return None
+    return resolved["path"]
+
+
+def write_resolved_checkpoint(sidecar_path, checkpoint_path):
+    """
+    Record a resolved checkpoint path so that subsequent runs (resumes, sweeps) can skip the cache search.
+
+    Args:
+        sidecar_path (str or None): Path to the sidecar JSON file
+        checkpoint_path (str): Resolved checkpoint file
+    """
+    if not sidecar_path:
+        return
+
+    try:
+        stat = os.stat(checkpoint_path)
+        resolved = {
+            "repo_id": DEFAULT_HF_MODEL_ID,
+            "path": os.path.abspath(checkpoint_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "ts": time.time(),
+        }
+        # Write to a uniquely named temporary file first, so that concurrent readers never see a partial file and
+        # concurrent writers (jobs sharing the $HF_HOME mount) never clobber each other's temporary file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar_path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(resolved, f)
+            # mkstemp creates the file as 0600; make the sidecar readable by jobs running as other users
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, sidecar_path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning("Could not record resolved checkpoint in %s: %s", sidecar_path, e)
+
+
+def resolve_pretrained_checkpoint(hf_cache_dirs, pretrained_checkpoint, sidecar_path=None):
     """
     Resolve pretrained checkpoint using fallback strategy.
 
     Args:
-        hf_cache_dir (str): Path to HuggingFace cache directory
+        hf_cache_dirs (list): Paths to HuggingFace cache directories, in order of preference
         pretrained_checkpoint (str): User-specified checkpoint argument
+        sidecar_path (str): Optional path to the sidecar file recording the checkpoint resolved by a previous run
 
     Returns:
-        str: Resolved checkpoint path or HuggingFace model ID
+        str or None: Resolved checkpoint path or HuggingFace model ID, or None if a user-specified directory does not
+        contain exactly one usable checkpoint (the error is logged)
     """
     # Use user-specified HuggingFace model ID if provided
     if pretrained_checkpoint and pretrained_checkpoint.startswith("CogACT/"):
         logger.info("Using user-specified HuggingFace model ID: %s", pretrained_checkpoint)
         return pretrained_checkpoint
 
-    # Check for cached checkpoint in HF cache directory
-    if hf_cache_dir:
+    # Use user-specified local checkpoint file (or a directory containing one) without scanning any cache; an explicit
+    # checkpoint is never replaced by the base model
+    if pretrained_checkpoint:
+        if os.path.isfile(pretrained_checkpoint):
+            logger.info("Using user-specified checkpoint file: %s", pretrained_checkpoint)
+            return pretrained_checkpoint
+        if os.path.isdir(pretrained_checkpoint):
+            # Run directory as written by scripts/train.py: `load_vla` expects exactly one checkpoints/*.pt file
+            run_checkpoints = glob.glob(os.path.join(glob.escape(pretrained_checkpoint), "checkpoints", "*.pt"))
+            if len(run_checkpoints) == 1:
+                logger.info("Using checkpoint found in user-specified run directory: %s", run_checkpoints[0])
+                return run_checkpoints[0]
+            if len(run_checkpoints) > 1:
+                logger.error(
+                    "Found %d checkpoints in %s/checkpoints, pass one of them as --pretrained_checkpoint",
+                    len(run_checkpoints),
+                    pretrained_checkpoint,
+                )
+                return None
+            local_checkpoint = find_checkpoint_in_directory(pretrained_checkpoint, "user-specified")
+            if local_checkpoint:
+                logger.info("Using checkpoint found in user-specified directory: %s", local_checkpoint)
+                return local_checkpoint
+            logger.error("No checkpoint found in user-specified directory: %s", pretrained_checkpoint)
+            return None
+
+        # Anything else is left to `load_vla`, which looks it up as a HuggingFace model ID (and fails if there is none)
+        logger.info("Passing user-specified checkpoint through unchanged: %s", pretrained_checkpoint)
+        return pretrained_checkpoint
+
+    # Reuse the checkpoint resolved by a previous run, if it is still valid
+    resolved_checkpoint = read_resolved_checkpoint(sidecar_path)
+    if resolved_checkpoint:
+        logger.info("Using checkpoint resolved by a previous run (%s): %s", sidecar_path, resolved_checkpoint)
+        return resolved_checkpoint
+
+    # Check for cached checkpoint in HF cache directories; the searches are I/O bound (often on different mounts), so
+    # run them concurrently and take the first hit in order of preference
+    hf_cache_dirs = [cache_dir for cache_dir in dict.fromkeys(hf_cache_dirs) if cache_dir]
+    if hf_cache_dirs:
         logger.info("Local checkpoint not found, checking HuggingFace cache...")
-        cached_checkpoint = find_checkpoint_in_directory(hf_cache_dir, "cached COGACT")
+        with ThreadPoolExecutor(max_workers=len(hf_cache_dirs)) as pool:
+            cached_checkpoints = list(
+                pool.map(functools.partial(find_checkpoint_in_directory, description="cached COGACT"), hf_cache_dirs)
+            )
+        cached_checkpoint = next((path for path in cached_checkpoints if path), None)
         if cached_checkpoint:
             logger.info("SUCCESS: Found cached COGACT checkpoint in HF cache: %s", cached_checkpoint)
             logger.info("Using cached checkpoint file instead of downloading from HuggingFace")
+            write_resolved_checkpoint(sidecar_path, cached_checkpoint)
             return cached_checkpoint
 
     # Fall back to downloading from HuggingFace
@@ -125,21 +429,68 @@ def resolve_pretrained_checkpoint(hf_cache_dir, pretrained_checkpoint):
     return DEFAULT_HF_MODEL_ID
 
 
+def predownload_checkpoint(model_id, cache_dir):
+    """
+    Download a HuggingFace CogACT checkpoint once, before the training workers start.
+
+    Otherwise every torchrun worker resolves the HF model ID on its own and they race on the (possibly network-mounted)
+    HF cache. Only the files `load_vla` needs are fetched: the configs and the checkpoint under checkpoints/.
+
+    Args:
+        model_id (str): HuggingFace model ID, e.g. CogACT/CogACT-Base
+        cache_dir (str or None): HuggingFace hub cache directory (None for the huggingface_hub default)
+
+    Returns:
+        str: Path to the downloaded checkpoint file, or model_id if it could not be downloaded or located
+    """
+    logger.info("Pre-downloading %s before launching training workers...", model_id)
+    try:
+        snapshot_path = snapshot_download(
+            repo_id=model_id, cache_dir=cache_dir, allow_patterns=["*.json", "checkpoints/*.pt"]
+        )
+    except (OSError, ValueError, RuntimeError) as e:
+        # hf_transfer reports its download failures as RuntimeError
+        logger.warning("Pre-download failed (%s), training workers will download %s themselves", e, model_id)
+        return model_id
+
+    # `load_vla` expects exactly one checkpoint under checkpoints/ (same check as for an HF model ID)
+    checkpoint_paths = glob.glob(os.path.join(glob.escape(snapshot_path), "checkpoints", "*.pt"))
+    if len(checkpoint_paths) != 1:
+        logger.warning("Expected one checkpoint in %s/checkpoints, found %d", snapshot_path, len(checkpoint_paths))
+        return model_id
+
+    return checkpoint_paths[0]
+
+
 def process_command_line_args():
     """
     Extract --pretrained_checkpoint argument and return remaining args.
 
+    Both `--pretrained_checkpoint VALUE` and `--pretrained_checkpoint=VALUE` are accepted; if given several times, the
+    last one wins. Everything else is forwarded to the training script untouched (in a single pass over sys.argv).
+
     Returns:
         tuple: (filtered_args, user_checkpoint_preference)
     """
-    # Parse arguments to extract --pretrained_checkpoint
-    parser = argparse.ArgumentParser(add_help=False)
-    parser.add_argument(
-        "--pretrained_checkpoint", type=str, default=None, help="Pretrained checkpoint path or HuggingFace model ID"
-    )
-    known_args, unknown_args = parser.parse_known_args()
-
-    return unknown_args, known_args.pretrained_checkpoint
+    argv = sys.argv[1:]
+    filtered_args, pretrained_checkpoint = [], None
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--pretrained_checkpoint":
+            if i + 1 >= len(argv):
+                sys.exit("error: argument --pretrained_checkpoint: expected one argument")
+            pretrained_checkpoint = argv[i + 1]
+            i += 2
+            continue
+        if arg.startswith("--pretrained_checkpoint="):
+            pretrained_checkpoint = arg.split("=", 1)[1]
+        else:
+            filtered_args.append(arg)
+        i += 1
+
+    return filtered_args, pretrained_checkpoint
 
 
 def main():
@@ -155,17 +506,27 @@ def main():
     # Extract --pretrained_checkpoint argument from command line
     args, pretrained_checkpoint = process_command_line_args()
 
-    # Build torchrun command
-    cmd = [
-        "torchrun",
+    # Build torchrun arguments
+    distrib_args = [
         "--standalone",
         "--nproc-per-node",
         str(os.environ.get("GPU_COUNT", DEFAULT_GPU_COUNT)),
         "scripts/train.py",
     ]
 
+    # Search the HF_HOME root first (where pre-downloaded checkpoints are placed, see README), then the hub cache
     hf_home = os.environ.get("HF_HOME")
-    resolved_checkpoint = resolve_pretrained_checkpoint(hf_home, pretrained_checkpoint)
+    hf_cache_dirs = [hf_home, _resolve_hf_cache_dir()]
+    sidecar_path = os.path.join(hf_home, RESOLVED_CHECKPOINT_SIDECAR) if hf_home else None
+    resolved_checkpoint = resolve_pretrained_checkpoint(hf_cache_dirs, pretrained_checkpoint, sidecar_path)
+    if resolved_checkpoint is None:
+        return 1
+    if resolved_checkpoint.startswith("CogACT/"):
+        downloaded_checkpoint = predownload_checkpoint(resolved_checkpoint, _resolve_hf_cache_dir())
+        # Record the default model's download so that the next run skips the search (sidecar entries are per model ID)
+        if resolved_checkpoint == DEFAULT_HF_MODEL_ID and downloaded_checkpoint != resolved_checkpoint:
+            write_resolved_checkpoint(sidecar_path, downloaded_checkpoint)
+        resolved_checkpoint = downloaded_checkpoint
 
     logger.info("Resolved pretrained checkpoint: %s", resolved_checkpoint)
 
@@ -173,17 +534,21 @@ def main():
     args.extend(["--pretrained_checkpoint", resolved_checkpoint])
 
     # Build final command with all arguments
-    cmd.extend(args)
+    distrib_args.extend(args)
 
-    # Run training command
-    logger.info("Running training command: %s", " ".join(cmd))
+    # Run training command in-process (same as the `torchrun` entry point, minus one interpreter start-up)
+    logger.info("Running training command: torchrun %s", " ".join(distrib_args))
 
     try:
-        result = subprocess.run(cmd, check=False, text=True)
-        return result.returncode
-    except (subprocess.SubprocessError, OSError) as e:
+        run(get_args_parser().parse_args(distrib_args))
+    except ChildFailedError as e:
         logger.error("Training failed: %s", e)
         return 1
+    except SystemExit as e:
+        logger.error("Invalid torchrun arguments: %s", distrib_args)
+        return e.code if isinstance(e.code, int) else 1
+
+    return 0
 
 
 if __name__ == "__main__":
@@ -215,15 +215,20 @@ class CogACT(nn.Module):
         )
 
         # Load from Checkpoint (Custom --> should load both *projector* and *llm* weights)
-        model_state_dict = torch.load(pretrained_checkpoint, map_location="cpu")["model"]
+        #   =>> `mmap=True` maps the file instead of reading it all into host memory; tensors are paged in lazily as
+        #       `load_state_dict` copies them into the modules (and entries we never load are never read from disk)
+        model_state_dict = torch.load(pretrained_checkpoint, map_location="cpu", mmap=True)["model"]
         assert (
             "projector" in model_state_dict and "llm_backbone" in model_state_dict
         ), "PrismaticVLM `from_pretrained` expects checkpoint with keys for `projector` AND `llm_backbone`!"
 
-        vlm.projector.load_state_dict(model_state_dict["projector"])
-        vlm.llm_backbone.load_state_dict(model_state_dict["llm_backbone"])
+        #   =>> For a frozen (inference) VLM, `assign=True` adopts the memory-mapped tensors as parameters instead of
+        #       copying them into the freshly initialized ones, so each weight is read from disk exactly once
+        vlm_load_kwargs = dict(assign=True) if freeze_weights else {}
+        vlm.projector.load_state_dict(model_state_dict["projector"], **vlm_load_kwargs)
+        vlm.llm_backbone.load_state_dict(model_state_dict["llm_backbone"], **vlm_load_kwargs)
         if "vision_backbone" in model_state_dict.keys():
-            vlm.vision_backbone.load_state_dict(model_state_dict["vision_backbone"])
+            vlm.vision_backbone.load_state_dict(model_state_dict["vision_backbone"], **vlm_load_kwargs)
 
         # Freeze Weights
         if freeze_weights: